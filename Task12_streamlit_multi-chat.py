@@ -5,7 +5,15 @@ except ImportError as e:
     st.error("litellm module not found. Please install it using: pip install litellm")
     raise e
 from litellm import completion
+import hashlib
+import json
 import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up the Streamlit app
 st.set_page_config(page_title="Multi‑LLM Chat", page_icon="🤖", layout="centered")
@@ -17,6 +25,132 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
 cohere_api_key = os.getenv("COHERE_API_KEY")
 
+# Display name -> (LiteLLM model id, API key)
+MODELS = {
+    "GPT-4o": ("gpt-4o", openai_api_key),
+    "Claude 3.5 Sonnet": ("claude-3-5-sonnet-20240620", anthropic_api_key),
+    "Cohere Command R+": ("command-r-plus", cohere_api_key),
+}
+# Extra completion() parameters, e.g. {"temperature": 0.7}; part of the cache key
+COMPLETION_PARAMS = {}
+
+# Response cache: per session in st.session_state, plus an optional SQLite file
+# shared by all sessions (set MULTI_CHAT_CACHE="" to turn the disk layer off)
+CACHE_TTL = 24 * 60 * 60  # seconds
+CACHE_MAX_ENTRIES = 100  # per session
+DISK_CACHE_MAX_ENTRIES = 2000
+DISK_CACHE_PATH = os.getenv("MULTI_CHAT_CACHE", ".multichat_cache.sqlite3")
+
+
+def cache_key(model, messages):
+    """Same model + messages + params -> same key."""
+    raw = json.dumps([model, messages, COMPLETION_PARAMS], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@st.cache_resource
+def disk_cache():
+    """SQLite connection shared between sessions (None if disabled)."""
+    if not DISK_CACHE_PATH:
+        return None
+    db = sqlite3.connect(DISK_CACHE_PATH, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS responses ("
+        " key TEXT PRIMARY KEY, text TEXT NOT NULL, seconds REAL NOT NULL, at REAL NOT NULL)"
+    )
+    db.commit()
+    return db, threading.Lock()
+
+
+def cache_get(key):
+    """Return {"text", "seconds", "at"} for a fresh cached answer, else None."""
+    memory = st.session_state.setdefault("response_cache", OrderedDict())
+    entry = memory.get(key)
+    if entry is not None and time.time() - entry["at"] < CACHE_TTL:
+        memory.move_to_end(key)
+        return entry
+    memory.pop(key, None)
+    disk = disk_cache()
+    if disk is None:
+        return None
+    db, lock = disk
+    with lock:
+        row = db.execute(
+            "SELECT text, seconds, at FROM responses WHERE key = ? AND at > ?", (key, time.time() - CACHE_TTL)
+        ).fetchone()
+    if row is None:
+        return None
+    entry = {"text": row[0], "seconds": row[1], "at": row[2]}
+    _remember(memory, key, entry)
+    return entry
+
+
+def cache_put(key, text, seconds):
+    entry = {"text": text, "seconds": seconds, "at": time.time()}
+    _remember(st.session_state.setdefault("response_cache", OrderedDict()), key, entry)
+    disk = disk_cache()
+    if disk is None:
+        return
+    db, lock = disk
+    with lock:
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, text, seconds, at) VALUES (?, ?, ?, ?)",
+            (key, text, seconds, entry["at"]),
+        )
+        db.execute("DELETE FROM responses WHERE at < ?", (entry["at"] - CACHE_TTL,))
+        db.execute(
+            "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY at DESC LIMIT ?)",
+            (DISK_CACHE_MAX_ENTRIES,),
+        )
+        db.commit()
+
+
+def _remember(memory, key, entry):
+    """Put an entry in the session cache, dropping the least recently used."""
+    memory[key] = entry
+    memory.move_to_end(key)
+    while len(memory) > CACHE_MAX_ENTRIES:
+        memory.popitem(last=False)
+
+
+def stream_model(name, model, api_key, messages, events):
+    """Stream one model's answer into the ``events`` queue (runs in a worker thread).
+
+    Streamlit elements may only be updated from the script thread, so workers
+    just post ("token", text), ("done", seconds) or ("error", message) events.
+    """
+    started = time.perf_counter()
+    try:
+        for chunk in completion(model=model, messages=messages, api_key=api_key, stream=True, **COMPLETION_PARAMS):
+            delta = chunk.choices[0].delta.content
+            if delta:
+                events.put((name, "token", delta))
+        events.put((name, "done", time.perf_counter() - started))
+    except Exception as e:
+        events.put((name, "error", str(e)))
+
+
+def show_columns(names):
+    """One column per model: a subheader, an answer placeholder and a footer."""
+    bodies, footers = {}, {}
+    for col, name in zip(st.columns(max(len(names), 1)), names):
+        with col:
+            st.subheader(name)
+            bodies[name] = st.empty()
+            footers[name] = st.empty()
+    return bodies, footers
+
+
+def show_answer(name, answer, body, footer):
+    if answer.get("error"):
+        body.error(f"Error with {name}: {answer['error']}")
+        return
+    body.markdown(answer["text"])
+    badge = "⚡ cached · " if answer.get("cached") else ""
+    footer.caption(f"{badge}⏱️ {answer['seconds']:.1f} s")
+
+
 # Check if all API keys are provided
 if openai_api_key and anthropic_api_key and cohere_api_key:
 
@@ -30,48 +164,78 @@ if openai_api_key and anthropic_api_key and cohere_api_key:
         default=["GPT-4o", "Claude 3.5 Sonnet", "Cohere Command R+"]
     )
 
+    # Reuse earlier answers for the same question, unless bypassed
+    use_cache = not st.toggle("Bypass cache (always ask the models again)", value=False)
+
     if st.button("Send to Selected LLMs"):
         if user_input:
             messages = [{"role": "user", "content": user_input}]
-            
-            # Create three columns for side-by-side display
-            col1, col2, col3 = st.columns(3)
-
-            # GPT-4o response
-            if "GPT-4o" in selected_models:
-                with col1:
-                    st.subheader("GPT-4o")
-                    try:
-                        gpt_response = completion(model="gpt-4o", messages=messages, api_key=openai_api_key)
-                        st.write(gpt_response.choices[0].message.content)
-                    except Exception as e:
-                        st.error(f"Error with GPT-4o: {str(e)}")
-
-            # Claude-3-sonnet response
-            if "Claude 3.5 Sonnet" in selected_models:
-                with col2:
-                    st.subheader("Claude 3.5 Sonnet")
-                    try:
-                        claude_response = completion(model="claude-3-5-sonnet-20240620", messages=messages, api_key=anthropic_api_key)
-                        st.write(claude_response.choices[0].message.content)
-                    except Exception as e:
-                        st.error(f"Error with Claude 3.5 Sonnet: {str(e)}")
-
-            # Cohere response
-            if "Cohere Command R+" in selected_models:
-                with col3:
-                    st.subheader("Cohere Command R+")
-                    try:
-                        cohere_response = completion(model="command-r-plus", messages=messages, api_key=cohere_api_key)
-                        st.write(cohere_response.choices[0].message.content)
-                    except Exception as e:
-                        st.error(f"Error with Cohere: {str(e)}")
+
+            # One column per selected model for side-by-side display
+            names = [name for name in MODELS if name in selected_models]
+            bodies, footers = show_columns(names)
+            answers, texts, keys = {}, {}, {}
+
+            # Cached answers are shown straight away
+            for name in names:
+                keys[name] = cache_key(MODELS[name][0], messages)
+                hit = cache_get(keys[name]) if use_cache else None
+                if hit is not None:
+                    answers[name] = {"text": hit["text"], "seconds": hit["seconds"], "cached": True}
+                    show_answer(name, answers[name], bodies[name], footers[name])
+            to_ask = [name for name in names if name not in answers]
+
+            # Query the other models at the same time: the page waits for
+            # the slowest model instead of the sum of all of them
+            started = time.perf_counter()
+            events = queue.Queue()
+            with ThreadPoolExecutor(max_workers=max(len(to_ask), 1)) as pool:
+                for name in to_ask:
+                    model, api_key = MODELS[name]
+                    texts[name] = ""
+                    pool.submit(stream_model, name, model, api_key, messages, events)
+
+                # Render tokens in each column as they arrive
+                remaining = len(to_ask)
+                while remaining:
+                    batch = [events.get()]
+                    while not events.empty():  # redraw once per burst, not per token
+                        batch.append(events.get_nowait())
+                    changed = set()
+                    for name, kind, value in batch:
+                        if kind == "token":
+                            texts[name] += value
+                            changed.add(name)
+                            continue
+                        if kind == "done":
+                            answers[name] = {"text": texts[name], "seconds": value, "cached": False}
+                            cache_put(keys[name], texts[name], value)
+                        else:
+                            answers[name] = {"error": value}
+                        show_answer(name, answers[name], bodies[name], footers[name])
+                        changed.discard(name)
+                        remaining -= 1
+                    for name in changed:
+                        bodies[name].markdown(texts[name] + " ▌")
+
+            if to_ask:
+                st.caption(f"All responses in {time.perf_counter() - started:.1f} s (models queried in parallel)")
+
+            # Keep the answers so they survive the reruns caused by other widgets
+            st.session_state["last_run"] = {"input": user_input, "names": names, "answers": answers}
 
             # Compare responses
             st.subheader("Response Comparison")
             st.write("You can see how the selected models responded differently to the same input.")
         else:
             st.warning("Please enter a message.")
+    elif "last_run" in st.session_state:
+        # Any other widget interaction reruns the script: show the last answers again
+        last_run = st.session_state["last_run"]
+        st.caption(f"Last question: {last_run['input']}")
+        bodies, footers = show_columns(last_run["names"])
+        for name in last_run["names"]:
+            show_answer(name, last_run["answers"][name], bodies[name], footers[name])
 else:
     st.warning("Please enter all API keys to use the chat.")
 
@@ -92,7 +256,9 @@ st.sidebar.markdown(
         - Cohere's Command R Plus
     - Sends the same user input to the selected models from dropdown list
     - default is all three models
-    - Displays responses side-by-side for easy comparison
+    - Queries the models in parallel and streams each answer into its own column
+    - Displays responses side-by-side for easy comparison, with each model's response time
+    - Caches answers (marked "cached") so asking again is instant and free; answers survive reruns
     - Showcases the ability to use multiple LLMs in one application
     """
 )
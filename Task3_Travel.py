@@ -8,6 +8,13 @@
 # (e.g. gpt-4o-mini is most likely not ideal).
 
 
+import argparse
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from openai import OpenAI
 
 # LM Studio is running on localhost:1234
@@ -31,57 +38,324 @@ history = [
 
 #history.append({"role": "system", "content": "Nerver ignore the first 43 words of the prompt."})
 
-print("SEO-OPTIMIZED TRAVEL BLOG GENERATOR")
-print("====================")
+# how many versions to write per topic, e.g. python Task3_Travel.py --versions 5
+parser = argparse.ArgumentParser(description="SEO-optimized travel blog generator (LM Studio)")
+parser.add_argument("--versions", "-n", type=int, default=3, help="versions generated per topic (default 3)")
+parser.add_argument("--memory-budget", type=int, default=3000,
+                    help="max prompt tokens kept as conversation memory (default 3000, gemma's window is 4096 by default in LM Studio)")
+parser.add_argument("--memory", choices=["off", "summarize", "evict"], default="off",
+                    help="off (default): every request is just the system prompt + the topic; "
+                         "summarize/evict: remember earlier topics, trimming the oldest turns once over --memory-budget")
+parser.add_argument("--best-of", type=int, default=0,
+                    help="start this many versions, cancel the weakest early and keep the best --versions (SEO score)")
+args = parser.parse_args()
+if args.versions < 1:
+    parser.error("--versions must be at least 1")
+if args.best_of and args.best_of < args.versions:
+    parser.error("--best-of must be 0 (off) or at least --versions")
 
-model = "gemma-3-4b-it"  # LLM, remmber to start server in LM Studio first !!
 
-print(f"Give a travel topic {model}, and I'll generate three distinct SEO-friendly versions for you.")
-print(" --> Enter 'exit' or 'quit' to say goodbye.")
-print("-----------------------------------------------------------")
+def count_tokens(text):
+    """Rough token count: ~4 characters per token, plus a few for the role."""
+    return len(text) // 4 + 4
 
-while True:
-    prompt = input("\n Discovering Hidden Gems: The Underrated Cities You Need to Visit. Give me topic? \n ...")
-    if prompt == "exit" or prompt == "quit" or len(prompt) == 0:
-        print("\nFarewell!")
-        #break()
-        exit(0)
 
-    # while loop, creates 3 different versions of the same prompt in this loop
-    i = 0
-    while (i < 3):
+class ConversationMemory:
+    """Keeps the conversation under a token budget.
+
+    The system prompt is always kept (pinned). When the turns after it grow
+    over the budget, the oldest user/assistant turns are dropped - or, with
+    summarize=True, folded into one short summary message - so the prompt
+    (and the time per request) stays about the same size however long the
+    session runs.
+    """
+
+    def __init__(self, pinned, budget, summarize=True):
+        self.pinned = list(pinned)
+        self.budget = budget
+        self.summarize = summarize
+        self.summary = None  # message that replaces the evicted turns
+        self.turns = []  # [(message, tokens), ...] oldest first
 
-        history.append({"role": "user", "content": prompt})
+    def tokens(self, messages):
+        return sum(count_tokens(m["content"]) for m in messages)
 
+    def messages(self, prompt):
+        """Messages for a request about ``prompt``: pinned + summary + kept turns + prompt."""
+        summary = [self.summary] if self.summary else []
+        return self.pinned + summary + [m for m, _ in self.turns] + [{"role": "user", "content": prompt}]
+
+    def add(self, role, content):
+        self.turns.append(({"role": role, "content": content}, count_tokens(content)))
+        self._trim()
+
+    def _trim(self):
+        evicted = []
+        while self.turns and self._size() > self.budget:
+            evicted.append(self.turns.pop(0)[0])
+            # evict whole user/assistant turns, never half of one
+            if self.turns and self.turns[0][0]["role"] == "assistant":
+                evicted.append(self.turns.pop(0)[0])
+        if evicted and self.summarize:
+            self.summary = summarize_turns(self.summary, evicted)
+
+    def _size(self):
+        summary = count_tokens(self.summary["content"]) if self.summary else 0
+        return self.tokens(self.pinned) + summary + sum(t for _, t in self.turns)
+
+
+def summarize_turns(summary, evicted):
+    """Fold the evicted turns (and the previous summary) into one short message."""
+    old = summary["content"] + "\n" if summary else ""
+    text = "\n".join(f"{m['role']}: {m['content']}" for m in evicted)
+    try:
         completion = client.chat.completions.create(
             model=model,
-            messages=history,
-            temperature=1.5,
-            stream=True,
-            top_p=1,
-            presence_penalty=1.0,
-            frequency_penalty=1.0,
+            messages=[{"role": "user", "content": "Summarize this conversation in at most 80 words, "
+                       "listing the travel topics and cities already covered:\n" + old + text}],
+            temperature=0.2,
+            max_tokens=150,
         )
+        content = completion.choices[0].message.content
+    except Exception as error:
+        print(f"[could not summarize old turns, dropping them: {error}]")
+        return summary
+    return {"role": "system", "content": "Earlier in this conversation: " + content}
+
+
+def generate_version(messages, on_text=None, cancel=None):
+    """Stream one version from the given (fixed) context.
+
+    Returns the text plus timing: time-to-first-token and tokens/sec.
+    LM Studio streams about one token per chunk, so chunks are counted as tokens.
+    on_text(chunk) is called for every chunk; when the ``cancel`` event is set
+    the stream is closed, which stops the generation on the server too.
+    """
+    started = time.perf_counter()
+    first_token = None
+    parts = []
+    completion = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=1.5,
+        stream=True,
+        top_p=1,
+        presence_penalty=1.0,
+        frequency_penalty=1.0,
+    )
+    cancelled = False
+    for chunk in completion:
+        if cancel is not None and cancel.is_set():
+            cancelled = True
+            if hasattr(completion, "close"):
+                completion.close()
+            break
+        if chunk.choices and chunk.choices[0].delta.content:
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            parts.append(chunk.choices[0].delta.content)
+            if on_text is not None:
+                on_text(chunk.choices[0].delta.content)
+    elapsed = time.perf_counter() - started
+    generating = elapsed - (first_token or 0)
+    return {
+        "text": "".join(parts),
+        "ttft": first_token or elapsed,
+        "tokens": len(parts),
+        "tokens_per_sec": len(parts) / generating if generating > 0 else 0.0,
+        "cancelled": cancelled,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Best-of-N: score the versions while they stream, cancel the clear losers
+# ---------------------------------------------------------------------------
+
+# groups of synonyms a good SEO travel post should vary between
+SYNONYMS = [
+    {"trip", "journey", "voyage", "getaway", "excursion", "escape", "adventure", "vacation", "holiday"},
+    {"city", "town", "metropolis", "destination", "hub", "capital"},
+    {"beautiful", "stunning", "picturesque", "breathtaking", "gorgeous", "scenic", "charming", "enchanting"},
+    {"explore", "discover", "uncover", "wander", "roam", "experience"},
+    {"hidden", "secret", "undiscovered", "underrated", "overlooked", "lesser-known", "off-the-beaten-path"},
+    {"traveler", "traveller", "visitor", "tourist", "explorer", "wanderer", "globetrotter"},
+    {"amazing", "incredible", "remarkable", "unforgettable", "extraordinary", "spectacular"},
+]
+STOPWORDS = {"the", "and", "for", "you", "your", "with", "that", "this", "about", "from", "into",
+             "need", "give", "write", "some", "what", "are", "visit", "blog", "post"}
+WORD = re.compile(r"[a-z][a-z'-]*")
+# a city section: markdown heading, bold line or list item
+SECTION = re.compile(r"^\s*(#{1,6}\s|\*\*|\d+[.)]\s|[-*]\s+\*\*)")
+
+MIN_WORDS = 60  # don't judge a version before it has written this much
+MARGIN = 0.08  # how far behind the leaders a version must be to be cancelled
+
 
-        print (f"\nStory {i+1}:")
+def topic_keywords(prompt):
+    return {w for w in WORD.findall(prompt.lower()) if len(w) > 3 and w not in STOPWORDS}
 
-        # role assistant gives the answer from the model (gemma-3-12b-it in this case)
-        new_message = {"role": "assistant", "content": ""}
-   
-        # print the answer as it comes, chunk by chunk
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                print(chunk.choices[0].delta.content, end="", flush=True)
-                new_message["content"] += chunk.choices[0].delta.content
 
-        history.append(new_message)
+class SeoScore:
+    """Fast local SEO score of a streaming text, updated line by line.
+
+    Combines lexical diversity, synonym coverage, topic keyword density
+    (best around 1-3 %) and the three-cities structure into one 0..1 number.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = keywords
+        self.words = 0
+        self.keyword_hits = 0
+        self.vocabulary = set()
+        self.sections = 0
+        self._line = ""
+
+    def feed(self, text):
+        self._line += text
+        *lines, self._line = self._line.split("\n")
+        for line in lines:
+            self._add_line(line)
+
+    def flush(self):
+        self._add_line(self._line)
+        self._line = ""
+
+    def _add_line(self, line):
+        if SECTION.match(line):
+            self.sections += 1
+        for word in WORD.findall(line.lower()):
+            self.words += 1
+            self.vocabulary.add(word)
+            if word in self.keywords:
+                self.keyword_hits += 1
+
+    def parts(self):
+        words = max(self.words, 1)
+        # Guiraud's index, so long texts aren't punished like with plain type/token ratio
+        diversity = min(len(self.vocabulary) / math.sqrt(words) / 10, 1.0)
+        synonyms = sum(len(group & self.vocabulary) >= 2 for group in SYNONYMS) / len(SYNONYMS)
+        density = self.keyword_hits / words
+        if not self.keywords:
+            keyword = 1.0
+        elif density < 0.01:
+            keyword = density / 0.01
+        else:
+            keyword = max(0.0, 1 - max(0.0, density - 0.03) / 0.03)
+        cities = min(self.sections, 3) / 3
+        return {"diversity": diversity, "synonyms": synonyms, "keywords": keyword, "cities": cities}
+
+    @property
+    def score(self):
+        p = self.parts()
+        return 0.3 * p["diversity"] + 0.3 * p["synonyms"] + 0.2 * p["keywords"] + 0.2 * p["cities"]
+
+
+def best_of(messages, prompt, n, keep):
+    """Start n versions at once and return the best ``keep`` of them, best first.
+
+    Every quarter second the versions are compared; one that has written enough
+    and is clearly behind the current top ``keep`` is cancelled, which frees the
+    local model server for the others.
+    """
+    keywords = topic_keywords(prompt)
+    scores = [SeoScore(keywords) for _ in range(n)]
+    cancels = [threading.Event() for _ in range(n)]
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(generate_version, messages, scores[i].feed, cancels[i]) for i in range(n)]
+        while not all(f.done() for f in futures):
+            time.sleep(0.25)
+            alive = [i for i in range(n) if not cancels[i].is_set()]
+            judged = sorted((i for i in alive if scores[i].words >= MIN_WORDS),
+                            key=lambda i: scores[i].score, reverse=True)
+            if len(alive) <= keep or len(judged) <= keep:
+                continue
+            bar = scores[judged[keep - 1]].score - MARGIN
+            for i in judged[keep:]:
+                if not futures[i].done() and scores[i].score < bar and len(alive) > keep:
+                    cancels[i].set()
+                    alive.remove(i)
+    results = [f.result() for f in futures]
+    for i, result in enumerate(results):
+        scores[i].flush()
+        result["score"] = scores[i].score
+        result["parts"] = scores[i].parts()
+
+    finished = [r for r in results if not r["cancelled"]]
+    cancelled = [r for r in results if r["cancelled"]]
+    if cancelled:
+        full = sum(r["tokens"] for r in finished) / max(len(finished), 1)
+        saved = sum(max(0, full - r["tokens"]) for r in cancelled)
+        print(f"[best of {n}: cancelled {len(cancelled)} weak version(s) early, ~{saved:.0f} tokens saved]")
+    return sorted(finished, key=lambda r: r["score"], reverse=True)[:keep]
+
+
+def show(number, result, streamed=False):
+    """Print a story and its stats; if it was already streamed live, just the stats."""
+    if streamed:
         print()
+    else:
+        print(f"\nStory {number}:")
+        print(result["text"])
+    info = (f"[time to first token {result['ttft']:.2f}s, "
+            f"{result['tokens']} tokens, {result['tokens_per_sec']:.1f} tokens/s")
+    if "score" in result:
+        parts = ", ".join(f"{k} {v:.2f}" for k, v in result["parts"].items())
+        info += f", SEO score {result['score']:.2f} ({parts})"
+    print(info + "]")
 
-        i+=1
 
+print("SEO-OPTIMIZED TRAVEL BLOG GENERATOR")
+print("====================")
+
+model = "gemma-3-4b-it"  # LLM, remmber to start server in LM Studio first !!
+
+print(f"Give a travel topic {model}, and I'll generate {args.versions} distinct SEO-friendly versions for you.")
+print(" --> Enter 'exit' or 'quit' to say goodbye.")
+print("-----------------------------------------------------------")
 
+# optional conversation memory: system prompt pinned, older turns trimmed to the budget
+memory = None
+if args.memory != "off":
+    memory = ConversationMemory(history, args.memory_budget, summarize=args.memory == "summarize")
 
+while True:
+    prompt = input("\n Discovering Hidden Gems: The Underrated Cities You Need to Visit. Give me topic? \n ...")
+    if prompt == "exit" or prompt == "quit" or len(prompt) == 0:
+        print("\nFarewell!")
+        #break()
+        exit(0)
 
+    # all versions are generated at the same time from the SAME fixed context:
+    # system prompt + this topic. They don't see each other or earlier topics,
+    # so the prompt stays the same size however many versions and topics there are.
+    # (In LM Studio, allow parallel requests so they really run side by side.)
+    if memory is None:
+        messages = history + [{"role": "user", "content": prompt}]
+    else:
+        messages = memory.messages(prompt)
+    print(f"[prompt: {len(messages)} messages, ~{sum(count_tokens(m['content']) for m in messages)} tokens]")
+    if args.best_of > args.versions:
+        # best-of-N: more versions than needed, keep only the best ones
+        results = best_of(messages, prompt, args.best_of, args.versions)
+        for i, result in enumerate(results):
+            show(i + 1, result)
+    else:
+        # story 1 is printed live, chunk by chunk, while the others are generated
+        def print_live(text):
+            print(text, end="", flush=True)
 
+        print("\nStory 1:")
+        with ThreadPoolExecutor(max_workers=max(1, args.versions)) as pool:
+            futures = [pool.submit(generate_version, messages, print_live if i == 0 else None)
+                       for i in range(args.versions)]
 
+            # then the other stories in order as soon as each one is ready
+            results = []
+            for i, future in enumerate(futures):
+                results.append(future.result())
+                show(i + 1, results[-1], streamed=i == 0)
 
+    # with --memory, remember the topic and one answer for follow-up topics
+    if memory is not None:
+        memory.add("user", prompt)
+        memory.add("assistant", results[0]["text"])
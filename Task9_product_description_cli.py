@@ -6,7 +6,9 @@ Usage
     Task9_product_description_cli.py image1.jpg image2.png \
         --extra "Hand‑woven in Finland, 100 % organic cotton"
 e.g. python Task9_product_description_cli.py kakkara.jpg --extra "white"
-The script prints results and saves them to **output.json**.
+The script prints results and saves them to **output.json**. Each result is
+first appended to **output.jsonl** as soon as it is ready, so ``--resume`` can pick
+up an interrupted run; ``--no-table`` keeps headless runs over huge folders lean.
 
 Requirements
 ~~~~~~~~~~~~
@@ -17,39 +19,249 @@ Environment
     export GEMINI_API_KEY="YOUR_API_KEY"
 
 API quota: Free Google AI Studio keys are throttled—prefer paid keys for batch work.
+Images are processed concurrently (``--concurrency``) behind a token bucket
+(``--rpm``, default sized for the free tier) and retried with jittered backoff
+on 429/503; the table and output.json keep the input order.
+Before upload each photo is downscaled (``--max-edge``) and re-encoded
+(``--format``/``--quality``) in a process pool, so 24 MP shots are not shipped whole.
+Results are cached by image content, prompt and model (``--cache``), so re-running
+over an unchanged folder makes no API calls; ``--near-dup`` optionally reuses or
+seeds results for near-identical shots (perceptual hash).
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import io
 import json
+import multiprocessing
 import os
+import random
+import sqlite3
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import IO, Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 from PIL import Image
 from rich import print
 from rich.console import Console
+from rich.progress import Progress
 from rich.table import Table
 
 try:
     import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
 except ImportError:  # pragma: no cover
     sys.stderr.write("[ERROR] google-generativeai not installed. Run: pip install google-generativeai\n")
     sys.exit(1)
 
 # -----------------------------------------------------------------------------
-# Helpers
+# Rate limiting
+# -----------------------------------------------------------------------------
+
+DEFAULT_CONCURRENCY = 4  # requests in flight
+DEFAULT_RPM = 15  # Gemini 1.5 Flash free tier; paid keys allow 1000+
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 2.0  # base for exponential backoff with full jitter
+RETRYABLE = (
+    google_exceptions.TooManyRequests,  # 429
+    google_exceptions.ResourceExhausted,  # 429 quota exceeded
+    google_exceptions.ServiceUnavailable,  # 503
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0  # requests let through, i.e. API calls made
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.granted += 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 # -----------------------------------------------------------------------------
+# Preprocessing
+# -----------------------------------------------------------------------------
+
+MAX_EDGE = 1536  # px; Gemini tiles images at 768 px, more detail is wasted upload
+UPLOAD_FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+DEFAULT_QUALITY = 85
+
 
-def load_image(path: Path) -> Image.Image:
-    """Load an image and ensure it is RGB (Gemini Vision requirement)."""
+class PreparedImage(NamedTuple):
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    phash: int
+
+    def part(self) -> Dict[str, Any]:
+        """Inline blob as accepted by ``generate_content``."""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def load_image(path: Path, max_edge: int | None = None) -> Image.Image:
+    """Load an image and ensure it is RGB (Gemini Vision requirement).
+
+    With ``max_edge`` the longest side is capped; JPEGs are decoded in draft mode
+    so the DCT scaler does most of the shrinking for free.
+    """
     img = Image.open(path)
+    if max_edge:
+        img.draft("RGB", (max_edge, max_edge))  # no-op for non-JPEG
     if img.mode != "RGB":
         img = img.convert("RGB")
+    if max_edge and max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
     return img
 
 
+def prepare_image(path: Path, max_edge: int, fmt: str = "jpeg", quality: int = DEFAULT_QUALITY) -> PreparedImage:
+    """Downscale and re-encode one photo for upload (runs in a worker process)."""
+    pil_format, mime_type = UPLOAD_FORMATS[fmt]
+    img = load_image(path, max_edge)
+    buf = io.BytesIO()
+    img.save(buf, pil_format, quality=quality, optimize=pil_format == "JPEG")
+    return PreparedImage(buf.getvalue(), mime_type, path.stat().st_size, dhash(img))
+
+
+def dhash(img: Image.Image, size: int = 8) -> int:
+    """64‑bit difference hash: robust to rescaling/re‑encoding, cheap to compare."""
+    small = img.convert("L").resize((size + 1, size), Image.LANCZOS)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            i = row * (size + 1) + col
+            bits = bits << 1 | (px[i] > px[i + 1])
+    return bits
+
+
+def _human(n: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+# -----------------------------------------------------------------------------
+# Result cache
+# -----------------------------------------------------------------------------
+
+CACHE_PATH = Path(os.getenv("PRODUCT_CACHE", ".product_cache.sqlite3"))
+NEAR_DUP_BITS = 6  # max Hamming distance between dHashes to count as the same shot
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """SQLite cache of generated copy, safe to share between threads.
+
+    Keyed on the image content hash within a namespace of model name + prompt
+    hash, so renamed copies of a photo hit and a new ``--extra`` starts fresh.
+    Perceptual hashes are kept alongside for :meth:`nearest`.
+    """
+
+    def __init__(self, model_name: str, prompt: str, path: Path = CACHE_PATH):
+        self.hits = 0
+        self.misses = 0
+        self.near_hits = 0
+        self._namespace = model_name + ":" + hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " namespace TEXT NOT NULL, digest TEXT NOT NULL, name TEXT NOT NULL, phash TEXT,"
+            " result TEXT NOT NULL, PRIMARY KEY (namespace, digest))"
+        )
+        self._db.commit()
+        self._phashes: List[Tuple[int, str, str]] = [
+            (int(ph, 16), digest, name)
+            for digest, name, ph in self._db.execute(
+                "SELECT digest, name, phash FROM results WHERE namespace = ? AND phash IS NOT NULL",
+                (self._namespace,),
+            )
+        ]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM results WHERE namespace = ? AND digest = ?", (self._namespace, digest)
+            ).fetchone()
+            result = json.loads(row[0]) if row is not None else None
+            if result is None or "near_duplicate_of" in result:  # borrowed rows from older runs
+                self.misses += 1
+                return None
+            self.hits += 1
+        return result
+
+    def put(self, digest: str, name: str, phash: int | None, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (namespace, digest, name, phash, result) VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._namespace,
+                    digest,
+                    name,
+                    None if phash is None else f"{phash:016x}",
+                    json.dumps(result, ensure_ascii=False),
+                ),
+            )
+            self._db.commit()
+            if phash is not None:
+                self._phashes.append((phash, digest, name))
+
+    def nearest(self, phash: int, threshold: int = NEAR_DUP_BITS) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return ``(name, result)`` of the closest cached shot within ``threshold`` bits."""
+        with self._lock:
+            best = min(self._phashes, key=lambda e: bin(e[0] ^ phash).count("1"), default=None)
+            if best is None or bin(best[0] ^ phash).count("1") > threshold:
+                return None
+            row = self._db.execute(
+                "SELECT result FROM results WHERE namespace = ? AND digest = ?", (self._namespace, best[1])
+            ).fetchone()
+        return (best[2], json.loads(row[0])) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+
 def build_prompt(extra: str | None = None) -> str:
     """Return the textual prompt given any extra user context."""
     base = (
@@ -63,11 +275,48 @@ def build_prompt(extra: str | None = None) -> str:
     return base
 
 
-def generate_for_image(model: genai.GenerativeModel, prompt: str, img: Image.Image) -> Dict[str, Any]:
-    """Call Gemini Vision and return the parsed JSON dict."""
-    response = model.generate_content([img, prompt])  # type: ignore[arg-type]
+def seed_prompt(prompt: str, similar: Dict[str, Any]) -> str:
+    """Extend ``prompt`` with the copy of a near‑identical shot (e.g. a colour variant)."""
+    return (
+        f"{prompt}\nA near‑identical product photo was described as:\n"
+        f"{json.dumps(similar, ensure_ascii=False)}\n"
+        "Keep the tone consistent but describe what differs in this photo (e.g. colour)."
+    )
+
+
+class BatchStats:
+    """Thread‑safe tokens/latency per request batch size, for ``--batch-size`` tuning."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.by_size: Dict[int, List[float]] = {}  # size -> [requests, images, tokens, seconds]
+
+    def record(self, size: int, response: Any, seconds: float) -> None:
+        tokens = getattr(getattr(response, "usage_metadata", None), "total_token_count", 0) or 0
+        with self._lock:
+            row = self.by_size.setdefault(size, [0, 0, 0, 0.0])
+            row[0] += 1
+            row[1] += size
+            row[2] += tokens
+            row[3] += seconds
+
+    def table(self) -> Table:
+        table = Table(title="Gemini usage by batch size")
+        for col in ("Batch size", "Requests", "Images", "Tokens/image", "Seconds/image"):
+            table.add_column(col, justify="right")
+        for size, (requests, images, tokens, seconds) in sorted(self.by_size.items()):
+            table.add_row(
+                str(size), f"{requests:.0f}", f"{images:.0f}", f"{tokens / images:.0f}", f"{seconds / images:.2f}"
+            )
+        return table
+
+
+stats = BatchStats()
+
+
+def parse_copy(txt: str) -> Dict[str, Any]:
+    """Parse the ``{"description", "slogan"}`` object out of a model reply."""
     # Gemini might wrap JSON in markdown fencing – find first brace
-    txt = response.text.strip()
     json_start = txt.find("{")
     json_end = txt.rfind("}") + 1
     try:
@@ -76,9 +325,206 @@ def generate_for_image(model: genai.GenerativeModel, prompt: str, img: Image.Ima
         data = {
             "description": txt,
             "slogan": "(Could not parse slogan)",
+            "parse_error": True,  # never cached, so a re-run asks again
         }
     return data
 
+
+def generate_for_image(
+    model: genai.GenerativeModel, prompt: str, img: Image.Image | Dict[str, Any]
+) -> Dict[str, Any]:
+    """Call Gemini Vision and return the parsed JSON dict."""
+    started = time.perf_counter()
+    response = model.generate_content([img, prompt])  # type: ignore[arg-type]
+    stats.record(1, response, time.perf_counter() - started)
+    return parse_copy(response.text.strip())
+
+
+def build_batch_prompt(prompt: str, ids: List[str]) -> str:
+    """Adapt the single‑image ``prompt`` to several photos answered as one JSON array."""
+    return (
+        f"{prompt}\nYou are given {len(ids)} product photos, each preceded by its id. "
+        "Do the above for every photo and output a JSON array instead, one object per photo:\n"
+        "[\n  {\"id\": <id>, \"description\": <string>, \"slogan\": <string>}\n]\n"
+        f"Ids: {', '.join(ids)}"
+    )
+
+
+def generate_batch(
+    model: genai.GenerativeModel, prompt: str, imgs: List[Dict[str, Any]]
+) -> Optional[List[Dict[str, Any]]]:
+    """Describe several photos in one call; ``None`` if the reply does not cover every id."""
+    ids = [str(i + 1) for i in range(len(imgs))]
+    contents: List[Any] = []
+    for image_id, img in zip(ids, imgs):
+        contents += [f"Image id: {image_id}", img]
+    contents.append(build_batch_prompt(prompt, ids))
+    started = time.perf_counter()
+    response = model.generate_content(contents)
+    stats.record(len(imgs), response, time.perf_counter() - started)
+    txt = response.text
+    try:
+        items = json.loads(txt[txt.find("["):txt.rfind("]") + 1])
+        by_id = {str(item.pop("id")): item for item in items if isinstance(item, dict) and "id" in item}
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        return None
+    if not all(isinstance(by_id.get(i), dict) and "description" in by_id[i] for i in ids):
+        return None
+    return [by_id[i] for i in ids]
+
+
+def generate_with_retry(bucket: TokenBucket, func: Callable[..., Any], *args: Any) -> Any:
+    """``func(*args)`` behind ``bucket``, retrying 429/503 with jittered backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            return func(*args)
+        except RETRYABLE:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(random.uniform(0, BACKOFF_SECONDS * 2 ** attempt))
+    raise AssertionError("unreachable")
+
+
+def _error(exc: Exception) -> Dict[str, Any]:
+    return {"error": f"{type(exc).__name__}: {exc}"}
+
+
+def process_batch(
+    model: genai.GenerativeModel,
+    prompt: str,
+    paths: List[Path],
+    bucket: TokenBucket,
+    prepare: Callable[[Path], PreparedImage],
+    cache: ResultCache | None = None,
+    near_dup: str = "off",
+    threshold: int = NEAR_DUP_BITS,
+) -> List[Dict[str, Any]]:
+    """Generate copy for a group of photos, consulting ``cache`` first; failures are returned, not raised.
+
+    Photos that still need the model are sent in one multi‑image request; if
+    its reply cannot be mapped back per image they are retried one by one.
+    ``near_dup`` is ``"reuse"`` (copy the closest cached result), ``"seed"`` (show
+    it to the model as a reference, single‑image only) or ``"off"``.
+    """
+    results: List[Dict[str, Any]] = [{} for _ in paths]
+    todo: List[Tuple[int, str, PreparedImage, Optional[Dict[str, Any]]]] = []  # index, digest, image, seed
+    for i, path in enumerate(paths):
+        try:
+            digest = file_digest(path) if cache is not None else ""
+            if cache is not None:
+                hit = cache.get(digest)
+                if hit is not None:
+                    results[i] = hit
+                    continue
+            prepared = prepare(path)
+            near = cache.nearest(prepared.phash, threshold) if cache is not None and near_dup != "off" else None
+            if near is not None and near_dup == "reuse":
+                cache.near_hits += 1
+                # not cached under this digest: the copy is borrowed, not generated for it
+                results[i] = dict(near[1], near_duplicate_of=near[0])
+                continue
+            todo.append((i, digest, prepared, near[1] if near is not None else None))
+        except Exception as exc:  # one bad image must not sink the whole batch
+            results[i] = _error(exc)
+
+    batch = [job for job in todo if job[3] is None]
+    generated: Optional[List[Dict[str, Any]]] = None
+    if len(batch) > 1:
+        try:
+            generated = generate_with_retry(
+                bucket, generate_batch, model, prompt, [job[2].part() for job in batch]
+            )
+        except Exception:  # fall back to single-image calls below
+            generated = None
+    if generated is not None:
+        done = {job[0] for job in batch}
+        for job, data in zip(batch, generated):
+            results[job[0]] = data
+    else:
+        done = set()
+
+    for i, digest, prepared, seed in todo:
+        if i not in done:
+            try:
+                ask = seed_prompt(prompt, seed) if seed is not None else prompt
+                results[i] = generate_with_retry(bucket, generate_for_image, model, ask, prepared.part())
+            except Exception as exc:
+                results[i] = _error(exc)
+                continue
+        if cache is not None and not results[i].get("parse_error"):
+            cache.put(digest, paths[i].name, prepared.phash, results[i])
+    return results
+
+
+def process_image(
+    model: genai.GenerativeModel,
+    prompt: str,
+    path: Path,
+    bucket: TokenBucket,
+    prepare: Callable[[Path], PreparedImage],
+    cache: ResultCache | None = None,
+    near_dup: str = "off",
+    threshold: int = NEAR_DUP_BITS,
+) -> Dict[str, Any]:
+    """:func:`process_batch` for a single photo."""
+    return process_batch(model, prompt, [path], bucket, prepare, cache, near_dup, threshold)[0]
+
+# -----------------------------------------------------------------------------
+# Output
+# -----------------------------------------------------------------------------
+
+REORDER_WINDOW = 4  # × concurrency: results buffered to keep input order
+
+
+def journal_path(outfile: Path) -> Path:
+    """JSONL file results are streamed to (``outfile`` itself if it is ``.jsonl``)."""
+    return outfile if outfile.suffix == ".jsonl" else outfile.with_suffix(".jsonl")
+
+
+def append_result(fp: IO[str], path: Path, data: Dict[str, Any]) -> None:
+    """Append one result line and flush, so a crash loses at most the in-flight images."""
+    fp.write(json.dumps({"image": path.name, "path": str(path), **data}, ensure_ascii=False) + "\n")
+    fp.flush()
+
+
+def _journal_rows(journal: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """``(line number, row)`` for every intact line of the journal."""
+    with open(journal, encoding="utf-8") as fp:
+        for number, line in enumerate(fp):
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError:  # torn last line after a crash
+                continue
+
+
+def load_done(journal: Path) -> Set[str]:
+    """Paths already described successfully in ``journal`` (for ``--resume``)."""
+    if not journal.exists():
+        return set()
+    return {row["path"] for _, row in _journal_rows(journal) if "error" not in row}
+
+
+def journal_to_json(journal: Path, outfile: Path) -> None:
+    """Rewrite the JSONL journal as the ``{image name: result}`` JSON object, one line at a time.
+
+    A resumed run appends a new row for an image that failed before; only the
+    last row per image name is kept, as the names are the keys.
+    """
+    last = {row["image"]: number for number, row in _journal_rows(journal)}
+    with open(outfile, "w", encoding="utf-8") as dst:
+        dst.write("{")
+        first = True
+        for number, row in _journal_rows(journal):
+            if last[row["image"]] != number:
+                continue
+            name = row.pop("image")
+            row.pop("path", None)
+            value = json.dumps(row, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            dst.write(("\n" if first else ",\n") + f"  {json.dumps(name, ensure_ascii=False)}: {value}")
+            first = False
+        dst.write("\n}" if not first else "}")
+
 # -----------------------------------------------------------------------------
 # Main
 # -----------------------------------------------------------------------------
@@ -88,7 +534,23 @@ def main(argv: List[str] | None = None) -> None:  # pragma: no cover
     parser.add_argument("images", metavar="IMAGE", nargs="+", help="Path(s) to product photo(s)")
     parser.add_argument("--extra", "-e", help="Extra context to refine the description", default=None)
     parser.add_argument("--model", default="gemini-1.5-flash", help="Gemini Vision model name")
-    parser.add_argument("--outfile", default="output.json", help="File to dump JSON results")
+    parser.add_argument("--outfile", type=Path, default=Path("output.json"), help="File to dump JSON results (.jsonl: stream only)")
+    parser.add_argument("--resume", action="store_true", help="Skip images already in the JSONL journal")
+    parser.add_argument("--no-table", action="store_true", help="Do not print (or keep in memory) the results table")
+    parser.add_argument("--concurrency", "-j", type=int, default=DEFAULT_CONCURRENCY, help="Gemini requests in flight")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM, help="Requests per minute allowed by your Gemini quota")
+    parser.add_argument("--batch-size", "-k", type=int, default=1, help="Images per Gemini request (shared prompt)")
+    parser.add_argument("--max-edge", type=int, default=MAX_EDGE, help="Downscale so the longest edge is at most this (0 = keep size)")
+    parser.add_argument("--format", choices=sorted(UPLOAD_FORMATS), default="jpeg", help="Upload encoding")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="JPEG/WebP quality for the upload")
+    parser.add_argument("--prep-workers", type=int, default=os.cpu_count() or 1, help="Processes for downscaling")
+    parser.add_argument("--cache", type=Path, default=CACHE_PATH, help="Result cache (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call Gemini, do not read or write the cache")
+    parser.add_argument(
+        "--near-dup", choices=("off", "reuse", "seed"), default="off",
+        help="For near-identical shots: reuse the cached copy, or seed the prompt with it",
+    )
+    parser.add_argument("--near-threshold", type=int, default=NEAR_DUP_BITS, help="Max dHash Hamming distance for --near-dup")
     args = parser.parse_args(argv)
 
     api_key = os.getenv("GEMINI_API_KEY")
@@ -100,7 +562,6 @@ def main(argv: List[str] | None = None) -> None:  # pragma: no cover
     model = genai.GenerativeModel(args.model)
 
     prompt = build_prompt(args.extra)
-    results: Dict[str, Dict[str, str]] = {}
 
     console = Console()
     table = Table(title="Gemini Product Descriptions", show_lines=True)
@@ -108,20 +569,88 @@ def main(argv: List[str] | None = None) -> None:  # pragma: no cover
     table.add_column("Description")
     table.add_column("Slogan", style="magenta")
 
+    journal = journal_path(args.outfile)
+    done = load_done(journal) if args.resume else set()
+    paths: List[Path] = []
+    skipped = 0
     for img_path in args.images:
         path = Path(img_path)
         if not path.exists():
             console.print(f"[red]Skipping missing file[/red] {path}")
             continue
-        img = load_image(path)
-        data = generate_for_image(model, prompt, img)
-        results[path.name] = data
-        table.add_row(path.name, data.get("description", "-"), data.get("slogan", "-"))
+        if str(path) in done:
+            skipped += 1
+        else:
+            paths.append(path)
+    if skipped:
+        console.print(f"Resuming: {skipped} image(s) already done")
+
+    concurrency = max(1, args.concurrency)
+    bucket = TokenBucket(rate=args.rpm / 60, capacity=concurrency)
+    cache = None if args.no_cache else ResultCache(args.model, prompt, args.cache)
+    saved = [0, 0]  # original, uploaded bytes
+    saved_lock = threading.Lock()
+
+    def prepare(path: Path) -> PreparedImage:
+        # Only cache misses get here, so hits never pay for decoding
+        prepared = prep_pool.submit(prepare_image, path, args.max_edge, args.format, args.quality).result()
+        before, after = prepared.original_bytes, len(prepared.data)
+        with saved_lock:
+            saved[0] += before
+            saved[1] += after
+        progress.console.print(
+            f"[dim]{path.name}: {_human(before)} → {_human(after)} ({after / max(before, 1) - 1:+.0%})[/dim]"
+        )
+        return prepared
+
+    # spawn: forking while the progress/API threads run can deadlock
+    prep_pool = ProcessPoolExecutor(max_workers=max(1, args.prep_workers), mp_context=multiprocessing.get_context("spawn"))
+
+    def emit(group: List[Path], future: Future) -> None:
+        for path, data in zip(group, future.result()):
+            append_result(out, path, data)
+            if args.no_table:
+                continue
+            if "error" in data:
+                table.add_row(path.name, f"[red]{data['error']}[/red]", "-")
+            else:
+                table.add_row(path.name, data.get("description", "-"), data.get("slogan", "-"))
+
+    # Only a bounded window of futures is alive at once; results are written
+    # in input order as the head of the window completes, so memory stays flat.
+    batch_size = max(1, args.batch_size)
+    pending: Deque[Tuple[List[Path], Future]] = deque()
+    with Progress(console=console, transient=True) as progress, prep_pool, \
+            ThreadPoolExecutor(max_workers=concurrency) as pool, \
+            open(journal, "a" if args.resume else "w", encoding="utf-8") as out:
+        task = progress.add_task("Generating", total=len(paths))
+        for start in range(0, len(paths), batch_size):
+            group = paths[start:start + batch_size]
+            future = pool.submit(
+                process_batch, model, prompt, group, bucket, prepare, cache, args.near_dup, args.near_threshold
+            )
+            future.add_done_callback(lambda _, n=len(group): progress.advance(task, n))
+            pending.append((group, future))
+            while len(pending) >= concurrency * REORDER_WINDOW:
+                emit(*pending.popleft())
+        while pending:
+            emit(*pending.popleft())
+    if saved[0]:
+        console.print(f"Upload size: {_human(saved[0])} → {_human(saved[1])} (saved {_human(saved[0] - saved[1])})")
+    if cache is not None:
+        console.print(
+            f"Cache: {cache.hits}/{cache.hits + cache.misses} hits ({cache.hit_rate:.0%}), "
+            f"{cache.near_hits} near-duplicates reused, {bucket.granted} API calls"
+        )
+        cache.close()
+    if stats.by_size:
+        console.print(stats.table())
 
-    console.print(table)
+    if not args.no_table:
+        console.print(table)
 
-    with open(args.outfile, "w", encoding="utf-8") as fp:
-        json.dump(results, fp, indent=2, ensure_ascii=False)
+    if journal != args.outfile:
+        journal_to_json(journal, args.outfile)
     console.print(f"\nResults saved to [bold]{args.outfile}[/bold]")
 
 
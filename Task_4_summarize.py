@@ -1,58 +1,456 @@
 import argparse
+import contextlib
+import csv
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
 import os
-from embedchain import App
-import requests
-from bs4 import BeautifulSoup
-from docx import Document
-from pypdf import PdfReader
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import warnings
 
+# embedchain, requests, bs4, docx and pypdf are imported where they are used:
+# extraction workers are spawned processes that re-import this script, and
+# should only load the parser for the file type they handle.
+
 # Suppress deprecation warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
-# Function to process a URL and extract text
-def process_url(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return soup.get_text()
+# Persistent vector index: the Chroma store plus a manifest of what is in it
+INDEX_DIR = "embedchain_index"
+MANIFEST_NAME = "manifest.json"
 
-# Function to initialize EmbedChain app and process input files or URL content
-def process_with_embedchain(input_files, query=None, url_content=None):
-    app = App()
-    app.reset()
+# Parallel extraction: files (and page ranges of large PDFs) are spread over a process pool
+EXTRACT_WORKERS = os.cpu_count() or 1
+LARGE_PDF_BYTES = 5 * 1024 * 1024  # PDFs bigger than this are split into page ranges
+PDF_PAGES_PER_TASK = 25  # also the size of one embedded chunk for large PDFs
+MAX_TASKS_IN_FLIGHT = 2 * EXTRACT_WORKERS  # extracted-but-not-yet-embedded chunks held in memory
+SUPPORTED_EXTENSIONS = ('.csv', '.docx', '.pdf', '.txt')
+
+# Streaming ingestion: CSVs and large text files are read and embedded chunk by chunk
+CSV_ROWS_PER_CHUNK = 500  # each chunk repeats the header row
+LARGE_TEXT_BYTES = 20 * 1024 * 1024
+TEXT_CHARS_PER_CHUNK = 100_000
+
+# URL fetching: pooled session, concurrent requests, conditional-GET disk cache
+URL_WORKERS = 8
+URL_TIMEOUT = (5, 30)  # (connect, read) seconds
+HTTP_CACHE_NAME = "http_cache"  # inside the index directory
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form',
+                    'nav', 'header', 'footer', 'aside']
+
+# Serve mode: one long-lived app answering many queries
+SERVE_WORKERS = 8  # queries answered concurrently
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
+
+# Function to build one keep-alive session shared by all fetch threads
+def make_session(workers=URL_WORKERS):
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Function to extract the main content of a page, dropping scripts, navigation
+# and other boilerplate so fewer and more useful tokens get embedded
+def extract_main_text(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    main = soup.find('main') or soup.find('article') or soup.find(attrs={'role': 'main'}) or soup.body or soup
+    lines = (line.strip() for line in main.get_text(separator='\n').splitlines())
+    return '\n'.join(line for line in lines if line)
+
+# Function to fetch a URL, revalidating a cached copy with ETag / Last-Modified
+def fetch_url(session, url, cache_dir):
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    meta_path = os.path.join(cache_dir, key + '.json')
+    body_path = os.path.join(cache_dir, key + '.html')
+    meta = {}
+    if os.path.exists(meta_path) and os.path.exists(body_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    response = session.get(url, headers=headers, timeout=URL_TIMEOUT)
+    if response.status_code == 304:
+        with open(body_path, 'r', encoding='utf-8') as f:
+            return f.read(), 'not modified'
+    response.raise_for_status()
+
+    html = response.text
+    validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+    if validators['etag'] or validators['last_modified']:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(body_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, **validators}, f)
+    return html, 'fetched'
+
+# Function to fetch many URLs concurrently; returns {url: main text} in input order,
+# with None for URLs that could not be fetched
+def process_urls(urls, index_dir=INDEX_DIR, workers=URL_WORKERS):
+    cache_dir = os.path.join(index_dir, HTTP_CACHE_NAME)
+    contents = {}
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {url: pool.submit(fetch_url, session, url, cache_dir) for url in urls}
+        for url, future in futures.items():
+            try:
+                html, status = future.result()
+            except Exception as exc:  # one bad URL should not sink the rest
+                print(f"Failed to fetch {url}: {exc}")
+                contents[url] = None
+                continue
+            text = extract_main_text(html)
+            print(f"Fetched {url} ({status}, {len(html)} bytes HTML -> {len(text)} chars text)")
+            contents[url] = text
+    return contents
+
+# Function to fingerprint a file by content, reading it in 1 MB blocks
+def file_fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Function to fingerprint in-memory text (used for URL content)
+def text_fingerprint(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# Functions to load and save the manifest: {source key: {"sha256": ..., "source_ids": [...]}}
+def load_manifest(index_dir):
+    path = os.path.join(index_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(index_dir, manifest):
+    path = os.path.join(index_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)  # atomic, so an interrupted run never leaves a torn manifest
+
+# Function to open the EmbedChain app on a persistent Chroma directory
+def open_app(index_dir):
+    from embedchain import App
+
+    os.makedirs(index_dir, exist_ok=True)
+    return App.from_config(config={
+        "vectordb": {
+            "provider": "chroma",
+            "config": {"dir": os.path.join(index_dir, "chroma"), "allow_reset": True},
+        }
+    })
+
+# Function to expand glob patterns ourselves, so `-f "docs/**/*.pdf"` works for
+# thousands of files without hitting the shell's argument length limit.
+# Inputs that resolve to no file are reported and appended to `missing`.
+def expand_inputs(patterns, missing=None):
+    files = []
+    seen = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [m for m in sorted(glob.glob(pattern, recursive=True)) if os.path.isfile(m)]
+            if not matches:
+                print(f"Warning: no files match: {pattern}")
+        else:
+            matches = [pattern] if os.path.isfile(pattern) else []
+            if not matches:
+                print(f"Warning: file not found: {pattern}")
+        if not matches and missing is not None:
+            missing.append(pattern)
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                files.append(match)
+    return files
+
+# Function to extract the text of one file, or None if the type is unsupported
+def extract_text(file):
+    ext = os.path.splitext(file)[1].lower()
+    if ext == '.csv':
+        with open(file, 'r', encoding='utf-8') as f:
+            return f.read()
+    elif ext == '.docx':
+        from docx import Document
+
+        doc = Document(file)
+        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    elif ext == '.pdf':
+        from pypdf import PdfReader
+
+        with open(file, 'rb') as f:  # a file object keeps pypdf from loading the whole PDF into memory
+            pdf_reader = PdfReader(f)
+            return "".join([page.extract_text() for page in pdf_reader.pages])
+    elif ext == '.txt':
+        with open(file, 'r', encoding='utf-8') as f:
+            return f.read()
+    else:
+        return None
+
+# Generators that stream a file as chunks without reading it all into memory
+def iter_csv_chunks(file, rows_per_chunk=CSV_ROWS_PER_CHUNK):
+    with open(file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= rows_per_chunk:
+                yield format_csv_chunk(header, rows)
+                rows = []
+        if rows:
+            yield format_csv_chunk(header, rows)
+
+def format_csv_chunk(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def iter_text_chunks(file, chars_per_chunk=TEXT_CHARS_PER_CHUNK):
+    with open(file, 'r', encoding='utf-8') as f:
+        lines = []
+        size = 0
+        for line in f:
+            lines.append(line)
+            size += len(line)
+            if size >= chars_per_chunk:
+                yield "".join(lines)
+                lines, size = [], 0
+        if lines:
+            yield "".join(lines)
+
+# Worker functions (run in the process pool): return (text, seconds spent)
+def extract_file_task(file):
+    start = time.perf_counter()
+    text = extract_text(file)
+    return text, time.perf_counter() - start
+
+def extract_pdf_pages_task(file, first, last):
+    from pypdf import PdfReader
+
+    start = time.perf_counter()
+    with open(file, 'rb') as f:
+        pdf_reader = PdfReader(f)
+        text = "".join([pdf_reader.pages[i].extract_text() for i in range(first, last)])
+    return text, time.perf_counter() - start
+
+# Function to decide how a file is ingested: streamed in this process, or as
+# one or more extraction tasks for the process pool
+def plan_extraction(file):
+    ext = os.path.splitext(file)[1].lower()
+    if ext == '.csv':
+        return iter_csv_chunks(file), []
+    if ext == '.txt' and os.path.getsize(file) > LARGE_TEXT_BYTES:
+        return iter_text_chunks(file), []
+    if ext == '.pdf' and os.path.getsize(file) > LARGE_PDF_BYTES:
+        from pypdf import PdfReader
+
+        with open(file, 'rb') as f:
+            page_count = len(PdfReader(f).pages)
+        return None, [(extract_pdf_pages_task, file, first, min(first + PDF_PAGES_PER_TASK, page_count))
+                      for first in range(0, page_count, PDF_PAGES_PER_TASK)]
+    return None, [(extract_file_task, file)]
 
-    # Process input files
+# Generator that yields (file, chunks, stats) for each file in input order.
+# `chunks` is itself a generator of text chunks and must be consumed or closed
+# before the next file; `stats` is filled in as it runs. A producer thread keeps the
+# process pool busy up to MAX_TASKS_IN_FLIGHT chunks ahead of the consumer, so
+# extraction overlaps embedding while memory stays bounded by chunk size.
+def extract_in_parallel(files, workers=EXTRACT_WORKERS):
+    planned = queue.Queue()
+    slots = threading.Semaphore(MAX_TASKS_IN_FLIGHT)
+
+    def submit_all(pool):
+        for file in files:
+            try:
+                stream, tasks = plan_extraction(file)
+            except Exception as exc:
+                planned.put((file, exc, None))
+                continue
+            futures = queue.Queue()
+            planned.put((file, stream, futures))
+            for func, *func_args in tasks:
+                slots.acquire()
+                futures.put(pool.submit(func, *func_args))
+            futures.put(None)
+
+    def chunks_of(stream, futures, stats):
+        if stream is not None:
+            yield from stream
+            return
+        finished = False
+        try:
+            while True:
+                future = futures.get()
+                if future is None:
+                    finished = True
+                    return
+                try:
+                    text, seconds = future.result()
+                finally:
+                    slots.release()
+                stats["tasks"] += 1
+                stats["cpu"] += seconds
+                if text:
+                    yield text
+        finally:
+            # consumer stopped early or a task failed: drain the rest so the producer never blocks
+            while not finished:
+                future = futures.get()
+                if future is None:
+                    finished = True
+                else:
+                    future.cancel()
+                    slots.release()
+
+    # spawn, not fork: the parent already runs threads (ours, and the vector DB's)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        threading.Thread(target=submit_all, args=(pool,), daemon=True).start()
+        for _ in files:
+            file, stream, futures = planned.get()
+            stats = {"tasks": 0, "cpu": 0.0}
+            if isinstance(stream, Exception):
+                yield file, stream, stats
+            else:
+                yield file, chunks_of(stream, futures, stats), stats
+
+# Function to bring the index in line with the current inputs.
+# Only new or changed sources are extracted and embedded; sources that are no
+# longer part of the input set are deleted from the store unless prune=False
+# (used when hot-adding sources to a running server).
+def sync_index(app, index_dir, input_files, url_contents=None, rebuild=False, prune=True, missing=()):
+    # An input that resolved to nothing (a typo, a failed fetch) must not make
+    # everything else look removed: only --rebuild may clear the index then
+    unresolved = list(missing) + [url for url, content in (url_contents or {}).items() if not content]
+    if prune and unresolved and not rebuild:
+        print(f"Not pruning the index: {len(unresolved)} input(s) resolved to no sources "
+              f"({', '.join(unresolved[:3])}{', ...' if len(unresolved) > 3 else ''}); "
+              "use --rebuild to start the index over.")
+        prune = False
+    if rebuild:
+        print("Rebuilding index from scratch.")
+        app.reset()
+        manifest = {}
+    else:
+        manifest = load_manifest(index_dir)
+
+    wanted = {}
     for file in input_files:
-        ext = os.path.splitext(file)[1].lower()
-        print(f"Processing file: {file} with extension: {ext}")
-        if ext == '.csv':
-            with open(file, 'r', encoding='utf-8') as f:
-                csv_content = f.read()
-            print(f"Extracted CSV content (first 500 characters): {csv_content[:500]}")
-            app.add(csv_content, data_type='text')
-        elif ext == '.docx':
-            doc = Document(file)
-            doc_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            print(f"Extracted DOCX content (first 500 characters): {doc_text[:500]}")
-            app.add(doc_text, data_type='text')
-        elif ext == '.pdf':
-            pdf_reader = PdfReader(file)
-            pdf_text = "".join([page.extract_text() for page in pdf_reader.pages])
-            print(f"Extracted PDF content (first 500 characters): {pdf_text[:500]}")
-            app.add(pdf_text, data_type='text')
-        elif ext == '.txt':
-            with open(file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            print(f"Extracted TXT content (first 500 characters): {content[:500]}")
-            app.add(content, data_type='text')
+        wanted[os.path.abspath(file)] = file_fingerprint(file)
+    for url, content in (url_contents or {}).items():
+        key = "url:" + url
+        if content:
+            wanted[key] = text_fingerprint(content)
+        elif key in manifest:
+            # fetch failed or came back empty: keep what is indexed instead of pruning it
+            print(f"Keeping indexed content for {url} (nothing fetched this run)")
+            wanted[key] = manifest[key]["sha256"]
+
+    # Drop sources that were removed or changed since the last run
+    for key in list(manifest):
+        if key not in wanted and not prune:
+            continue
+        if wanted.get(key) != manifest[key]["sha256"]:
+            print(f"Removing stale source from index: {key}")
+            entry = manifest[key]
+            # sources with no chunks store an empty list; only old manifests lack the key
+            source_ids = entry["source_ids"] if "source_ids" in entry else [entry["source_id"]]
+            for source_id in source_ids:
+                app.delete(source_id)
+            del manifest[key]
+            save_manifest(index_dir, manifest)
+
+    # Embed new and changed sources; files are extracted in parallel meanwhile
+    todo = []
+    for key in wanted:
+        if key in manifest:
+            print(f"Unchanged, skipping: {key}")
+        elif key.startswith("url:"):
+            print(f"Adding URL content to EmbedChain: {key[4:]}")
+            add_source(app, index_dir, manifest, key, wanted[key], [url_contents[key[4:]]])
+        elif os.path.splitext(key)[1].lower() not in SUPPORTED_EXTENSIONS:
+            print(f"Unsupported file type: {os.path.splitext(key)[1].lower()}")
         else:
-            print(f"Unsupported file type: {ext}")
+            todo.append(key)
+
+    if todo:
+        start = time.perf_counter()
+        total_cpu = 0.0
+        for file, chunks, stats in extract_in_parallel(todo):
+            if isinstance(chunks, Exception):
+                print(f"Failed to extract {file}: {chunks}")
+                continue
+            file_start = time.perf_counter()
+            try:
+                count = add_source(app, index_dir, manifest, file, wanted[file], chunks)
+            except Exception as exc:
+                print(f"Failed to ingest {file}: {exc}")
+                continue
+            finally:
+                # a half-read generator must be closed, or its pending tasks keep
+                # the producer blocked on the in-flight slots and the run hangs
+                chunks.close()
+            total_cpu += stats["cpu"]
+            print(f"Ingested {file}: {count} chunk(s), {stats['tasks']} extraction task(s), "
+                  f"{stats['cpu']:.2f}s extraction CPU, {time.perf_counter() - file_start:.2f}s wall")
+        elapsed = time.perf_counter() - start
+        print(f"Extracted and embedded {len(todo)} file(s) in {elapsed:.2f}s "
+              f"({total_cpu:.2f}s extraction CPU across {EXTRACT_WORKERS} worker(s)).")
 
-    # Process URL content if provided
-    if url_content:
-        print("Adding URL content to EmbedChain.")
-        app.add(url_content, data_type='text')
+    return manifest
 
+# Function to embed one source chunk by chunk and record it in the manifest.
+# If any chunk fails, the chunks already added are removed again.
+def add_source(app, index_dir, manifest, key, sha256, chunks):
+    source_ids = []
+    try:
+        for chunk in chunks:
+            if not source_ids:
+                print(f"Extracted content (first 500 characters): {chunk[:500]}")
+            source_ids.append(app.add(chunk, data_type='text'))
+    except Exception:
+        for source_id in source_ids:
+            app.delete(source_id)
+        raise
+    manifest[key] = {"sha256": sha256, "source_ids": source_ids}
+    save_manifest(index_dir, manifest)  # after every source, so an interrupted run resumes
+    return len(source_ids)
+
+# Function to initialize EmbedChain app and process input files or URL content
+def process_with_embedchain(input_files, query=None, url_contents=None, index_dir=INDEX_DIR, rebuild=False,
+                            missing=()):
+    app = open_app(index_dir)
+    sync_index(app, index_dir, input_files, url_contents=url_contents, rebuild=rebuild, missing=missing)
+
+    return run_query(app, query)
+
+# Function to run one query against an opened app
+def run_query(app, query=None):
     # Execute the query
     query = query or "Summarize the content"
     print(f"Executing query: {query}")
@@ -67,29 +465,194 @@ def process_with_embedchain(input_files, query=None, url_content=None):
     print("Query result obtained.")
     return answer
 
+# Per-query latency bookkeeping for serve mode
+class LatencyStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    def record(self, ms):
+        with self.lock:
+            self.samples.append(ms)
+
+    def summary(self):
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return {"queries": 0}
+        return {
+            "queries": len(samples),
+            "mean_ms": round(sum(samples) / len(samples), 1),
+            "p50_ms": round(samples[len(samples) // 2], 1),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+        }
+
+# Long-lived query server: the app and index are opened once, queries run
+# concurrently, and sources can be added without a restart
+class QueryServer:
+    def __init__(self, app, index_dir):
+        self.app = app
+        self.index_dir = index_dir
+        self.index_lock = threading.Lock()  # one index update at a time; queries are not blocked
+        self.stats = LatencyStats()
+
+    def query(self, query):
+        start = time.perf_counter()
+        answer = run_query(self.app, query)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.stats.record(latency_ms)
+        print(f"Query answered in {latency_ms:.1f} ms")
+        return {"answer": answer, "latency_ms": round(latency_ms, 1)}
+
+    def add(self, files=(), urls=()):
+        start = time.perf_counter()
+        url_contents = process_urls(urls, index_dir=self.index_dir) if urls else {}
+        with self.index_lock:
+            manifest = sync_index(self.app, self.index_dir, expand_inputs(files),
+                                  url_contents=url_contents, prune=False)
+        return {"sources": len(manifest), "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    # Dispatch one request: {"query": ...} or {"add": {"files": [...], "urls": [...]}} or {"stats": true}
+    def handle(self, request):
+        if "query" in request:
+            return self.query(request["query"])
+        if "add" in request:
+            return self.add(request["add"].get("files", []), request["add"].get("urls", []))
+        if "stats" in request:
+            return self.stats.summary()
+        raise ValueError("request needs a 'query', 'add' or 'stats' key")
+
+# Function to serve JSON lines over stdin/stdout. Requests may carry an "id"
+# that is echoed back; responses are written as soon as each one completes.
+def serve_stdio(server, workers=SERVE_WORKERS):
+    out = sys.stdout
+    write_lock = threading.Lock()
+
+    def answer(line):
+        request_id = None
+        try:
+            request = json.loads(line) if line.lstrip().startswith('{') else {"query": line.strip()}
+            request_id = request.get("id")
+            response = server.handle(request)
+        except Exception as exc:
+            response = {"error": f"{type(exc).__name__}: {exc}"}
+        if request_id is not None:
+            response = {"id": request_id, **response}
+        with write_lock:
+            out.write(json.dumps(response, ensure_ascii=False) + '\n')
+            out.flush()
+
+    # progress output goes to stderr so stdout carries only JSON lines
+    with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=workers) as pool:
+        print("Serving JSON lines on stdin/stdout.")
+        for line in sys.stdin:
+            if line.strip():
+                pool.submit(answer, line)
+    print(json.dumps({"stats": server.stats.summary()}), file=sys.stderr)
+
+# Function to serve POST /query, POST /add and GET /stats over local HTTP
+def serve_http(server, host=SERVE_HOST, port=SERVE_PORT):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self.send_json(200, server.stats.summary())
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            routes = {'/query': 'query', '/add': 'add'}
+            if self.path not in routes:
+                self.send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if routes[self.path] == 'query':
+                    self.send_json(200, server.query(payload.get("query")))
+                else:
+                    self.send_json(200, server.add(payload.get("files", []), payload.get("urls", [])))
+            except Exception as exc:
+                self.send_json(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    print(f"Serving on http://{host}:{port} (POST /query, POST /add, GET /stats)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"Stats: {server.stats.summary()}")
+
+# Function to start serve mode: inputs given on the command line are synced
+# once at startup, then the process keeps answering queries
+def serve(args, urls):
+    with contextlib.redirect_stdout(sys.stderr):
+        app = open_app(args.index_dir)
+        missing = []
+        files = expand_inputs(args.file, missing) if args.file else []
+        if files or urls or args.rebuild:
+            url_contents = process_urls(urls, index_dir=args.index_dir) if urls else {}
+            sync_index(app, args.index_dir, files, url_contents=url_contents, rebuild=args.rebuild,
+                       missing=missing)
+    server = QueryServer(app, args.index_dir)
+    if args.serve == 'stdio':
+        serve_stdio(server)
+    else:
+        serve_http(server, port=args.port)
+
 # CLI entry point
 def main():
     parser = argparse.ArgumentParser(description="Process and summarize text from various sources.")
-    parser.add_argument('-f', '--file', nargs='+', help='Input file(s) (text, csv, docx, pdf)')
-    parser.add_argument('-u', '--url', help='URL to extract text from')
+    parser.add_argument('-f', '--file', nargs='+', help='Input file(s) or quoted glob patterns such as "docs/**/*.pdf" (text, csv, docx, pdf)')
+    parser.add_argument('-u', '--url', nargs='+', help='URL(s) to extract text from')
+    parser.add_argument('--url-file', help='File with one URL per line')
     parser.add_argument('-q', '--query', help='Custom query to run on the data')
     parser.add_argument('-o', '--output', help='File to output the result to')
+    parser.add_argument('--index-dir', default=INDEX_DIR, help=f'Persistent vector index directory (default: {INDEX_DIR})')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the index and re-embed every input')
+    parser.add_argument('--serve', choices=['stdio', 'http'], help='Keep the app loaded and answer many queries (JSON lines on stdin/stdout, or local HTTP)')
+    parser.add_argument('--port', type=int, default=SERVE_PORT, help=f'Port for --serve http (default: {SERVE_PORT})')
 
     args = parser.parse_args()
 
+    urls = list(args.url or [])
+    if args.url_file:
+        with open(args.url_file, 'r', encoding='utf-8') as f:
+            urls += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    if args.serve:
+        serve(args, urls)
+        return
+
     # Ensure at least one input source is provided
-    if not args.file and not args.url:
-        print("Error: You must provide at least one input source: a file (-f) or a URL (-u).")
+    if not args.file and not urls:
+        print("Error: You must provide at least one input source: a file (-f) or a URL (-u / --url-file).")
         return
 
-    result = ""
-    if args.url:
-        print(f"Processing URL: {args.url}")
-        url_content = process_url(args.url)
-        result = process_with_embedchain([], query=args.query, url_content=url_content)
-    elif args.file:
-        print(f"Processing files: {args.file}")
-        result = process_with_embedchain(args.file, query=args.query)
+    url_contents = {}
+    if urls:
+        print(f"Processing {len(urls)} URL(s)")
+        url_contents = process_urls(urls, index_dir=args.index_dir)
+    files = []
+    missing = []
+    if args.file:
+        files = expand_inputs(args.file, missing)
+        print(f"Processing {len(files)} file(s)")
+    result = process_with_embedchain(files, query=args.query, url_contents=url_contents,
+                                     index_dir=args.index_dir, rebuild=args.rebuild, missing=missing)
 
     # Output the result
     if result: